@@ -10,21 +10,40 @@ class RAGMethodCaller:
     ----
     retriever:
         The retriever object that will be used to retrieve documents.
-        
+
+    vectorstore:
+        The vector store handle shared with methods that search it directly.
+
+    embeddings:
+        The embedding model shared with methods that batch query embeddings.
+
+    llm:
+        A shared ChatOpenAI client reused by every method, so the underlying
+        HTTP connection is kept alive across calls.
+
     Methods
     -------
     call_method(method_name):
         Calls the specified RAG method based on the method name provided.
     """
-    def __init__(self, retriever):
+    def __init__(self, retriever, vectorstore=None, embeddings=None, llm=None):
         """
         Initializes the RAGMethodCaller with the retriever object.
-        
+
         parameters
         ----------
         retriever:
             The retriever object that will be used to retrieve documents.
-            
+
+        vectorstore:
+            The vector store handle shared with methods that search it directly.
+
+        embeddings:
+            The embedding model shared with methods that batch query embeddings.
+
+        llm:
+            A shared ChatOpenAI client reused by every method.
+
         Raises
         ------
         ValueError:
@@ -33,6 +52,9 @@ class RAGMethodCaller:
         if not retriever:
             raise ValueError("Retriever cannot be None")
         self.retriever = retriever
+        self.vectorstore = vectorstore
+        self.embeddings = embeddings
+        self.llm = llm
 
     def call_method(self, method_name):
         """
@@ -50,21 +72,28 @@ class RAGMethodCaller:
         """
         if method_name.lower() == "multi_query":
             try:
-                multi_query_retrieval = MultiQueryRetrieval(self.retriever)
+                multi_query_retrieval = MultiQueryRetrieval(self.retriever, llm=self.llm)
                 multi_query_retrieval.run()
             except ValueError as e:
                 print(f"Error in MultiQueryRetrieval: {e}")
 
         elif method_name.lower() == "fusion":
             try:
-                fusion_retrieval = FusionRetrieval(self.retriever)
+                fusion_retrieval = FusionRetrieval(
+                    self.retriever,
+                    vectorstore=self.vectorstore,
+                    embeddings=self.embeddings,
+                    llm=self.llm,
+                )
                 fusion_retrieval.run()
             except ValueError as e:
                 print(f"Error in FusionRetrieval: {e}")
 
         elif method_name.lower() == "decomposition":
             try:
-                decomposition_retrieval = DecompositionRetrieval(self.retriever)
+                decomposition_retrieval = DecompositionRetrieval(
+                    self.retriever, llm=self.llm
+                )
                 decomposition_retrieval.run()
             except ValueError as e:
                 print(f"Error in DecompositionRetrieval: {e}")
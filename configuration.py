@@ -1,9 +1,12 @@
 import os
 
+from langchain_core.caches import InMemoryCache
+from langchain.globals import set_llm_cache
+
 
 class Config:
     """
-    The Config class sets the API keys for the RAG process.
+    The Config class sets the API keys and the LLM cache for the RAG process.
 
     Attributes
     ----------
@@ -28,3 +31,7 @@ class Config:
         os.environ["LANGCHAIN_ENDPOINT"] = "https://api.smith.langchain.com"
         os.environ["LANGCHAIN_API_KEY"] = self.langchain_api_key
         os.environ["OPENAI_API_KEY"] = self.openai_api_key
+
+        # Cache LLM completions in memory so repeated prompts (e.g. the
+        # generated query lists for a repeated question) cost zero LLM calls
+        set_llm_cache(InMemoryCache())
@@ -1,9 +1,28 @@
 # Import necessary libraries
+import asyncio
+import hashlib
+import os
+import pickle
+
 import bs4
+import faiss
+import numpy as np
+import requests
+import tiktoken
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain_community.document_loaders import WebBaseLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_community.vectorstores import FAISS
+
+from embeddings import CachedEmbeddings
+
+# Load the BPE table once at import time; building it per split_documents
+# call dominates short-document processing when indexing many URLs
+_TOKEN_ENCODER = tiktoken.get_encoding("cl100k_base")
 
 
 class DocumentProcessor:
@@ -24,15 +43,33 @@ class DocumentProcessor:
         
     parse_classes: tuple
         The classes to parse from the HTML.
-        
+
+    embedding_model: str
+        The SentenceTransformer model used to embed chunks and queries locally.
+
+    embedding_cache_dir: str
+        The directory where computed embeddings are cached on disk.
+
+    doc_cache_dir: str
+        The directory where fetched and parsed documents are cached on disk.
+
+    persist_directory: str
+        The directory where the vector store is persisted across runs.
+
     Methods
     -------
+    fetch_url_validator:
+        Fetch the URL's cache validator via a HEAD request.
+
     load_documents:
-        Load the documents from the URL.
+        Load the documents from the URL or the disk cache.
         
     split_documents:
         Split the documents into chunks.
-        
+
+    build_embeddings:
+        Build the embedding model wrapped in a persistent on-disk cache.
+
     index_documents:
         Index the documents.
         
@@ -48,38 +85,112 @@ class DocumentProcessor:
         chunk_size=300,
         chunk_overlap=50,
         parse_classes=("post-content", "post-title", "post-header"),
+        embedding_model="sentence-transformers/all-MiniLM-L6-v2",
+        embedding_cache_dir="./.emb_cache",
+        doc_cache_dir="./.doc_cache",
+        persist_directory="./.faiss",
     ):
         self.url = url
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.parse_classes = parse_classes
+        self.embedding_model = embedding_model
+        self.embedding_cache_dir = embedding_cache_dir
+        self.doc_cache_dir = doc_cache_dir
+        self.persist_directory = persist_directory
         self.documents = None
         self.splits = None
+        self.embeddings = None
         self.vectorstore = None
         self.retriever = None
 
+    def fetch_url_validator(self):
+        """
+        Fetch the URL's cache validator (ETag or Last-Modified) via a HEAD
+        request, without downloading the page body.
+
+        parameters
+        ----------
+        None
+
+        returns
+        -------
+        str or None
+            The validator header value, or None if the request failed or the
+            server sent neither header.
+        """
+        try:
+            response = requests.head(self.url, timeout=10, allow_redirects=True)
+            return response.headers.get("ETag") or response.headers.get(
+                "Last-Modified"
+            )
+        except requests.RequestException:
+            return None
+
     def load_documents(self):
         """
-        load_documents method loads the documents from the URL.
-        
+        load_documents method loads the documents from the URL, fetching
+        asynchronously and parsing with lxml's C parser. Parsed documents
+        are cached on disk keyed by URL, so warm runs whose cache validator
+        still matches skip the fetch and parse entirely.
+
         parameters
         ----------
         None
-        
+
         implements
         ----------
         loader: WebBaseLoader
-            The WebBaseLoader object to load the documents.
-            
+            The WebBaseLoader object to load the documents. Async loading
+            overlaps network and parse time (and scales to multiple URLs),
+            while lxml parses large DOMs several times faster than the
+            pure-Python html.parser.
+
         documents: list
-            The list of documents loaded from the URL.
+            The list of documents loaded from the URL or the disk cache.
 
         """
+        cache_path = os.path.join(
+            self.doc_cache_dir,
+            hashlib.sha256(self.url.encode("utf-8")).hexdigest() + ".pkl",
+        )
+        cached = None
+        if os.path.isfile(cache_path):
+            with open(cache_path, "rb") as cache_file:
+                cached = pickle.load(cache_file)
+
+        # Serve from the cache when the server still reports the same
+        # content, and also when no validator could be obtained (server
+        # sends neither ETag nor Last-Modified, or the HEAD request failed,
+        # e.g. offline) — a cached copy beats refetching or failing
+        validator = self.fetch_url_validator()
+        if cached is not None and (
+            validator is None or cached.get("validator") == validator
+        ):
+            self.documents = cached["documents"]
+            return
+
         loader = WebBaseLoader(
             web_paths=(self.url,),
             bs_kwargs=dict(parse_only=bs4.SoupStrainer(class_=self.parse_classes)),
+            default_parser="lxml",
+            requests_per_second=2,
+            continue_on_failure=True,
         )
-        self.documents = loader.load()
+        self.documents = asyncio.run(loader.aload())
+
+        # A failed fetch (continue_on_failure) yields no documents; fall back
+        # to the stale cache instead of overwriting it with an empty list
+        if not self.documents:
+            if cached is not None:
+                self.documents = cached["documents"]
+            return
+
+        os.makedirs(self.doc_cache_dir, exist_ok=True)
+        with open(cache_path, "wb") as cache_file:
+            pickle.dump(
+                {"validator": validator, "documents": self.documents}, cache_file
+            )
 
     def split_documents(self):
         """
@@ -104,38 +215,102 @@ class DocumentProcessor:
         """
         if not self.documents:
             raise ValueError("Documents not loaded. Call load_documents() first.")
-        text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-            chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+            length_function=lambda text: len(_TOKEN_ENCODER.encode(text)),
         )
         self.splits = text_splitter.split_documents(self.documents)
 
+    def build_embeddings(self):
+        """
+        Build the embedding model wrapped in a persistent on-disk cache.
+
+        parameters
+        ----------
+        None
+
+        implements
+        ----------
+        embeddings: CacheBackedEmbeddings
+            A local MiniLM SentenceTransformer backed by a content-hash keyed
+            file store, so each chunk is embedded at most once across runs.
+            Embedding locally removes the OpenAI API from the hot path and
+            the 384-d vectors are 4x smaller than OpenAI's 1536-d ones.
+            Query embeddings are additionally memoized in memory, so repeated
+            queries skip the forward pass entirely.
+        """
+        base_embeddings = HuggingFaceEmbeddings(
+            model_name=self.embedding_model,
+            encode_kwargs={"batch_size": 64, "normalize_embeddings": True},
+        )
+        store = LocalFileStore(self.embedding_cache_dir)
+        self.embeddings = CacheBackedEmbeddings.from_bytes_store(
+            CachedEmbeddings(base_embeddings), store, namespace=self.embedding_model
+        )
+
     def index_documents(self):
         """
-        Index the documents.
-        
+        Index the documents, reusing the persisted vector store when available.
+
         parameters
         ----------
         None
-        
+
         implements
         ----------
-        vectorstore: Chroma
-            The Chroma object to index the documents.
-            
+        vectorstore: FAISS
+            The FAISS object to index the documents. Vectors are stored in an
+            exact scalar-quantized (FP16) inner-product index, halving index
+            memory and the bandwidth moved per similarity search with
+            negligible reconstruction error for top-k ranking. Loaded from
+            the persist directory on warm starts, built (and saved)
+            otherwise.
+
         retriever: Retriever
             The retriever for the indexed documents.
-            
+
         raises
         ------
         ValueError
-            If the documents are not split.
+            If the documents are not split and no persisted store exists.
         """
-        if not self.splits:
-            raise ValueError("Documents not split. Call split_documents() first.")
-        self.vectorstore = Chroma.from_documents(
-            documents=self.splits, embedding=OpenAIEmbeddings()
-        )
-        self.retriever = self.vectorstore.as_retriever()
+        self.build_embeddings()
+        if os.path.isdir(self.persist_directory) and os.listdir(self.persist_directory):
+            self.vectorstore = FAISS.load_local(
+                self.persist_directory,
+                self.embeddings,
+                allow_dangerous_deserialization=True,
+            )
+        else:
+            if not self.splits:
+                raise ValueError("Documents not split. Call split_documents() first.")
+
+            # Embed all chunks, normalize so inner product equals cosine,
+            # and store them in an FP16 scalar-quantized flat index
+            texts = [doc.page_content for doc in self.splits]
+            vectors = np.asarray(self.embeddings.embed_documents(texts), dtype="float32")
+            faiss.normalize_L2(vectors)
+            index = faiss.IndexScalarQuantizer(
+                vectors.shape[1],
+                faiss.ScalarQuantizer.QT_fp16,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+            index.train(vectors)
+            index.add(vectors)
+
+            self.vectorstore = FAISS(
+                embedding_function=self.embeddings,
+                index=index,
+                docstore=InMemoryDocstore(
+                    {str(i): doc for i, doc in enumerate(self.splits)}
+                ),
+                index_to_docstore_id={i: str(i) for i in range(len(self.splits))},
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+                normalize_L2=True,
+            )
+            self.vectorstore.save_local(self.persist_directory)
+        self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 4})
 
     def process(self):
         """
@@ -160,25 +335,28 @@ class DocumentProcessor:
         self.split_documents()
         self.index_documents()
 
-    def get_retriever(self):
+    def get_retriever(self, k=4):
         """
         returns the retriever for the indexed documents.
-        
+
         parameters
         ----------
-        None
-        
+        k: int
+            The number of chunks to retrieve per query. Methods that stuff
+            retrieved chunks into several prompts can pass a smaller k to
+            cut prompt tokens.
+
         returns
         -------
         retriever: Retriever
             The retriever for the indexed documents.
-            
+
         raises
         ------
         ValueError
             If the documents are not indexed.
         """
-        if not self.retriever:
+        if not self.vectorstore:
             raise ValueError("Documents not indexed. Call process() first.")
-        return self.retriever
+        return self.vectorstore.as_retriever(search_kwargs={"k": k})
 
@@ -0,0 +1,68 @@
+# Import necessary libraries
+from functools import lru_cache
+
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    The CachedEmbeddings class wraps an embedding model and memoizes
+    embed_query in an in-memory LRU cache, so repeated queries are served
+    from memory instead of paying an embedding round-trip each time.
+
+    Parameters
+    ----------
+    base_embeddings: Embeddings
+        The embedding model to wrap.
+
+    maxsize: int
+        The maximum number of query embeddings kept in the cache.
+
+    Methods
+    -------
+    embed_documents:
+        Embed a list of documents using the wrapped model.
+
+    embed_query:
+        Embed a query string, served from the cache for repeated queries.
+    """
+
+    def __init__(self, base_embeddings, maxsize=4096):
+        if not base_embeddings:
+            raise ValueError("Base embeddings cannot be None")
+        self.base_embeddings = base_embeddings
+        self._embed_query_cached = lru_cache(maxsize=maxsize)(
+            base_embeddings.embed_query
+        )
+
+    def embed_documents(self, texts):
+        """
+        Embed a list of documents using the wrapped model.
+
+        parameters
+        ----------
+        texts: list
+            The list of texts to embed.
+
+        returns
+        -------
+        list
+            A list of embedding vectors, one per text.
+        """
+        return self.base_embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        """
+        Embed a query string, served from the cache for repeated queries.
+
+        parameters
+        ----------
+        text: str
+            The query text to embed.
+
+        returns
+        -------
+        list
+            The embedding vector for the query.
+        """
+        return self._embed_query_cached(text)
@@ -1,3 +1,5 @@
+from langchain_openai import ChatOpenAI
+
 from call_methods import RAGMethodCaller
 from configuration import Config
 from document_processor import DocumentProcessor
@@ -17,8 +19,7 @@ def main():
     2. Initialize DocumentProcessor and process the URL.
     3. Initialize the RAGMethodCaller with the retriever.
     4. Set the method to use (can be 'multi_query', 'fusion', 'decomposition').
-    5. Prompt the user to enter the query.
-    6. Call the chosen method with the provided query.
+    5. Call the chosen method, which prompts the user for the query.
 
     returns
     -------
@@ -42,17 +43,20 @@ def main():
     document_processor.process()
     retriever = document_processor.get_retriever()
 
-    # Initialize the RAGMethodCaller with the retriever
-    rag_method_caller = RAGMethodCaller(retriever)
+    # Initialize the RAGMethodCaller with the retriever and shared clients
+    llm = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0)
+    rag_method_caller = RAGMethodCaller(
+        retriever,
+        vectorstore=document_processor.vectorstore,
+        embeddings=document_processor.embeddings,
+        llm=llm,
+    )
 
     # Set the method to use (can be 'multi_query', 'fusion', 'decomposition')
     method_name = "multi_query"  # Replace with your chosen method
 
-    # Prompt the user to enter the query
-    query = input("Please enter your query: ")
-
-    # Call the chosen method with the provided query
-    rag_method_caller.call_method(method_name, query)
+    # Call the chosen method; it prompts the user for the query
+    rag_method_caller.call_method(method_name)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_openai import ChatOpenAI
@@ -16,9 +18,19 @@ class DecompositionRetrieval:
     temperature: float
         The temperature parameter for the language model.
 
+    llm:
+        A shared ChatOpenAI client to reuse; built locally when not given.
+
+    k: int
+        The number of chunks to retrieve per sub-question. Defaults to 2
+        because each sub-question stuffs its chunks into its own prompt.
+
     Methods
     -------
 
+    answer_sub_question:
+        Retrieve documents and answer a single sub-question.
+
     retrieve_and_rag:
         RAG on each sub-question.
 
@@ -30,14 +42,24 @@ class DecompositionRetrieval:
 
     """
 
-    def __init__(self, retriever, temperature=0):
+    def __init__(self, retriever, temperature=0, llm=None, k=2):
         if not retriever:
             raise ValueError("Retriever cannot be None")
 
+        # Each sub-question's chunks land in a separate prompt, so retrieve
+        # fewer chunks than the general-purpose default when possible
+        if hasattr(retriever, "vectorstore"):
+            retriever = retriever.vectorstore.as_retriever(search_kwargs={"k": k})
+
         self.retriever = retriever
+        self.k = k
         self.temperature = temperature
         self.method_name = "decomposition"
-        self.llm = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=temperature)
+        self.llm = (
+            llm
+            if llm is not None
+            else ChatOpenAI(model_name="gpt-3.5-turbo", temperature=temperature)
+        )
 
         # Initialize prompt for generating sub-questions
         self.prompt_decomposition = ChatPromptTemplate.from_template(
@@ -72,6 +94,19 @@ Use the above context and any background question + answer pairs to answer the q
             """
         )
 
+        # Build the per-sub-question answer chain once so each call reuses
+        # the same runnable instead of re-composing and re-validating it
+        self.answer_chain = (
+            {
+                "context": itemgetter("question") | self.retriever,
+                "question": itemgetter("question"),
+                "q_a_pairs": itemgetter("q_a_pairs"),
+            }
+            | self.decomposition_prompt
+            | self.llm
+            | StrOutputParser()
+        )
+
     @staticmethod
     def format_qa_pair(question, answer):
         """
@@ -93,9 +128,26 @@ Use the above context and any background question + answer pairs to answer the q
 
         return f"Question: {question}\nAnswer: {answer}\n\n".strip()
 
+    def answer_sub_question(self, sub_question):
+        """
+        Retrieve documents and answer a single sub-question.
+
+        Parameters
+        ----------
+        sub_question: str
+            The sub-question to answer.
+
+        Returns
+        -------
+        str
+            The answer to the sub-question.
+        """
+        return self.answer_chain.invoke({"question": sub_question, "q_a_pairs": ""})
+
     def retrieve_and_rag(self, question, sub_question_generator_chain):
         """
-        RAG on each sub-question using decomposition prompt template and answer the main question sequentially.
+        RAG on each sub-question using decomposition prompt template, dispatching
+        the retrieval and LLM calls for all sub-questions concurrently.
 
         Parameters
         ----------
@@ -125,19 +177,24 @@ Use the above context and any background question + answer pairs to answer the q
             # Use decomposition chain to generate sub-questions
             sub_questions = sub_question_generator_chain.invoke({"question": question})
 
-            # Initialize a list to hold RAG chain results
-            rag_results = []
-
-            for sub_question in sub_questions:
-                
-                # Retrieve documents for each sub-question
-                retrieved_docs = self.retriever.get_relevant_documents(sub_question)
-
-                # Use retrieved documents and sub-question in RAG chain
-                answer = (
-                    self.decomposition_prompt | self.llm | StrOutputParser()
-                ).invoke({"context": retrieved_docs, "question": sub_question})
-                rag_results.append(answer)
+            # Batch all sub-questions so the retrieval and LLM round-trips
+            # overlap; if the chain cannot batch, fall back to a thread pool —
+            # both the retriever and the LLM release the GIL while waiting on
+            # HTTP, so threads overlap the network latency just as well
+            try:
+                rag_results = self.answer_chain.batch(
+                    [{"question": q, "q_a_pairs": ""} for q in sub_questions],
+                    config={"max_concurrency": len(sub_questions)},
+                )
+            except (AttributeError, NotImplementedError):
+                with ThreadPoolExecutor(
+                    max_workers=min(8, len(sub_questions))
+                ) as executor:
+                    futures = [
+                        executor.submit(self.answer_sub_question, q)
+                        for q in sub_questions
+                    ]
+                    rag_results = [future.result() for future in futures]
 
             return rag_results, sub_questions
         except Exception as e:
@@ -209,9 +266,14 @@ Use these to synthesize an answer to the question: {question}
             )
 
             final_rag_chain = final_prompt | self.llm | StrOutputParser()
-            final_answer = final_rag_chain.invoke(
+
+            # Stream tokens as they arrive so the user sees output at
+            # time-to-first-token instead of time-to-last-token
+            print("Final Answer: ", end="", flush=True)
+            for chunk in final_rag_chain.stream(
                 {"context": context, "question": question}
-            )
-            print("Final Answer:", final_answer)
+            ):
+                print(chunk, end="", flush=True)
+            print()
         except ValueError as e:
             print(f"Error: {e}")
@@ -1,9 +1,10 @@
-import json
+import asyncio
+import hashlib
+from collections import defaultdict
 from operator import itemgetter
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_openai import ChatOpenAI
-from langchain.load import dumps, loads
 
 
 class FusionRetrieval:
@@ -22,8 +23,20 @@ class FusionRetrieval:
     k: int
         The k parameter for the reciprocal rank fusion formula.
 
+    vectorstore:
+        The vector store to search directly when batching query embeddings.
+
+    embeddings:
+        The embedding model used to embed all generated queries in one call.
+
+    llm:
+        A shared ChatOpenAI client to reuse; built locally when not given.
+
     Methods
     -------
+    batch_retrieve:
+        Retrieve documents for all queries using a single embedding request.
+
     retrieve_documents:
         Retrieve documents using RAG Fusion queries.
 
@@ -36,17 +49,30 @@ class FusionRetrieval:
     reciprocal_rank_fusion:
         Reciprocal rank fusion that takes multiple lists of ranked documents and an optional parameter k used in the RRF formula.
 
+    compute_simhash:
+        Compute a 64-bit SimHash signature of a text.
+
+    deduplicate_documents:
+        Drop near-duplicate documents based on SimHash distance.
+
     """
 
-    def __init__(self, retriever, temperature=0, k=60):
+    def __init__(
+        self, retriever, temperature=0, k=60, vectorstore=None, embeddings=None, llm=None
+    ):
         if not retriever:
             raise ValueError("Retriever cannot be None")
 
         self.retriever = retriever
         self.temperature = temperature
         self.k = k
+        self.vectorstore = vectorstore
+        self.embeddings = embeddings
         self.method_name = "fusion"
-        self.llm = ChatOpenAI(temperature=temperature)
+        self.llm = llm if llm is not None else ChatOpenAI(temperature=temperature)
+
+        # Memoize generated query lists so repeated questions skip the LLM call
+        self._generated_queries = {}
 
         # Initialize prompt for generating RAG Fusion queries
         self.prompt_rag_fusion = ChatPromptTemplate.from_template(
@@ -101,30 +127,27 @@ Question: {question}
             raise ValueError("Results list cannot be empty")
 
         try:
-            # Initialize a dictionary to hold fused scores for each unique document
-            fused_scores = {}
+            # Track the first-seen document per key and its accumulated score;
+            # keying on page_content avoids JSON (de)serialization per doc
+            seen = {}
+            fused_scores = defaultdict(float)
 
             # Iterate through each list of ranked documents
             for docs in results:
 
                 # Iterate through each document in the list, with its rank (position in the list)
                 for rank, doc in enumerate(docs):
-
-                    # Convert the document to a string format to use as a key (assumes documents can be serialized to JSON)
-                    doc_str = dumps(doc)
-
-                    # If the document is not yet in the fused_scores dictionary, add it with an initial score of 0
-                    if doc_str not in fused_scores:
-                        fused_scores[doc_str] = 0
+                    key = doc.page_content
+                    seen.setdefault(key, doc)
 
                     # Update the score of the document using the RRF formula: 1 / (rank + k)
-                    fused_scores[doc_str] += 1 / (rank + k)
+                    fused_scores[key] += 1.0 / (rank + k)
 
             # Sort the documents based on their fused scores in descending order to get the final reranked results
             reranked_results = [
-                (loads(doc), score)
-                for doc, score in sorted(
-                    fused_scores.items(), key=lambda x: x[1], reverse=True
+                (seen[key], score)
+                for key, score in sorted(
+                    fused_scores.items(), key=itemgetter(1), reverse=True
                 )
             ]
 
@@ -133,10 +156,106 @@ Question: {question}
         except Exception as e:
             raise ValueError(f"Failed to perform reciprocal rank fusion: {str(e)}")
 
+    @staticmethod
+    def compute_simhash(text):
+        """
+        Compute a 64-bit SimHash signature of a text.
+
+        parameters
+        ----------
+        text: str
+            The text to fingerprint.
+
+        returns
+        -------
+        int
+            The 64-bit SimHash signature.
+        """
+        bit_counts = [0] * 64
+        for token in text.split():
+            token_hash = int.from_bytes(
+                hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big"
+            )
+            for i in range(64):
+                bit_counts[i] += 1 if (token_hash >> i) & 1 else -1
+        return sum(1 << i for i in range(64) if bit_counts[i] > 0)
+
+    @staticmethod
+    def deduplicate_documents(docs, max_distance=4):
+        """
+        Drop near-duplicate documents based on SimHash distance, keeping the
+        higher-ranked occurrence. Shrinks the context passed to the LLM,
+        which cuts prompt tokens and therefore cost and latency.
+
+        parameters
+        ----------
+        docs: list[tuple]
+            A list of (document, score) tuples, ordered by rank.
+
+        max_distance: int
+            The maximum Hamming distance at which two documents are
+            considered duplicates.
+
+        returns
+        -------
+        list[tuple]
+            The (document, score) tuples with near-duplicates removed.
+        """
+        kept = []
+        signatures = []
+        for doc, score in docs:
+            signature = FusionRetrieval.compute_simhash(doc.page_content)
+            if any(
+                bin(signature ^ seen).count("1") <= max_distance
+                for seen in signatures
+            ):
+                continue
+            signatures.append(signature)
+            kept.append((doc, score))
+        return kept
+
+    def batch_retrieve(self, queries):
+        """
+        Retrieve documents for all queries using a single embedding request.
+
+        parameters
+        ----------
+        queries: list
+            The list of query strings to retrieve documents for.
+
+        returns
+        -------
+        list[list]
+            A list of ranked document lists, one per query.
+        """
+        vectors = self.embeddings.embed_documents(queries)
+        return [
+            self.vectorstore.similarity_search_by_vector(vector, k=4)
+            for vector in vectors
+        ]
+
+    async def _gather_retrievals(self, queries):
+        """
+        Run the retriever for all queries concurrently.
+
+        parameters
+        ----------
+        queries: list
+            The list of query strings to retrieve documents for.
+
+        returns
+        -------
+        list[list]
+            A list of ranked document lists, one per query.
+        """
+        return await asyncio.gather(
+            *(self.retriever.ainvoke(query) for query in queries)
+        )
+
     def retrieve_documents(self, question: str):
         """
         Retrieve documents using RAG Fusion queries
-        
+
         parameters
         ----------
         question: str
@@ -156,12 +275,18 @@ Question: {question}
             raise ValueError("Question cannot be empty")
 
         try:
-            retrieval_chain = (
-                self.generate_queries
-                | self.retriever.map()
-                | (lambda results: self.reciprocal_rank_fusion(results, self.k))
-            )
-            docs = retrieval_chain.invoke({"question": question})
+            queries = self._generated_queries.get(question)
+            if queries is None:
+                queries = self.generate_queries.invoke({"question": question})
+                self._generated_queries[question] = queries
+            # Batch all query embeddings into one request when the vector
+            # store is available; otherwise overlap the per-query retriever
+            # calls instead of running them sequentially.
+            if self.vectorstore is not None and self.embeddings is not None:
+                results = self.batch_retrieve(queries)
+            else:
+                results = asyncio.run(self._gather_retrievals(queries))
+            docs = self.reciprocal_rank_fusion(results, self.k)
             if not docs:
                 raise ValueError("No documents retrieved for the given question.")
             return docs
@@ -170,21 +295,22 @@ Question: {question}
 
     def answer_question(self, question: str, docs: list):
         """
-        Generate an answer to the question based on retrieved documents
-        
+        Generate an answer to the question based on retrieved documents,
+        streaming tokens to stdout as they arrive.
+
         parameters
         ----------
         question: str
             The input question for which an answer needs to be generated.
-            
+
         docs: list
             A list of documents retrieved based on the input question.
-            
+
         returns
         -------
         answer: str
             The answer generated based on the retrieved documents.
-            
+
         raises
         ------
         ValueError
@@ -194,14 +320,21 @@ Question: {question}
             raise ValueError("No documents retrieved to generate an answer")
 
         try:
+            # Filter near-duplicate chunks before building the context string
+            docs = self.deduplicate_documents(docs)
             context = "\n".join([doc.page_content for doc, score in docs])
-            final_rag_chain = (
+            final_rag_chain = self.rag_template | self.llm | StrOutputParser()
+
+            # Stream tokens as they arrive so the user sees output at
+            # time-to-first-token instead of time-to-last-token
+            chunks = []
+            for chunk in final_rag_chain.stream(
                 {"context": context, "question": question}
-                | self.rag_template
-                | self.llm
-                | StrOutputParser()
-            )
-            return final_rag_chain.invoke({"question": question})
+            ):
+                print(chunk, end="", flush=True)
+                chunks.append(chunk)
+            print()
+            return "".join(chunks)
         except Exception as e:
             raise ValueError(f"Failed to generate answer: {str(e)}")
 
@@ -224,7 +357,7 @@ Question: {question}
         question = input("Please enter your question: ")
         try:
             docs = self.retrieve_documents(question)
-            answer = self.answer_question(question, docs)
-            print("Answer:", answer)
+            print("Answer: ", end="", flush=True)
+            self.answer_question(question, docs)
         except ValueError as e:
             print(f"Error: {e}")
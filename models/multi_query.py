@@ -1,7 +1,6 @@
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_openai import ChatOpenAI
-from langchain.load import dumps, loads
 
 
 class MultiQueryRetrieval:
@@ -17,6 +16,9 @@ class MultiQueryRetrieval:
     temperature: float
         The temperature parameter for the language model.
 
+    llm:
+        A shared ChatOpenAI client to reuse; built locally when not given.
+
     Methods
     -------
     retrieve_documents:
@@ -29,14 +31,14 @@ class MultiQueryRetrieval:
         Run the multi-query retrieval and answering process.
     """
 
-    def __init__(self, retriever, temperature=0):
+    def __init__(self, retriever, temperature=0, llm=None):
         if not retriever:
             raise ValueError("Retriever cannot be None")
 
         self.retriever = retriever
         self.temperature = temperature
         self.method_name = "multi_query"
-        self.llm = ChatOpenAI(temperature=temperature)
+        self.llm = llm if llm is not None else ChatOpenAI(temperature=temperature)
 
         # Initialize prompt for generating query perspectives
         self.prompt_perspectives = ChatPromptTemplate.from_template(
@@ -89,12 +91,13 @@ Question: {question}
             raise ValueError("Documents list cannot be empty")
 
         try:
-            # Flatten list of lists, and convert each Document to string
-            flattened_docs = [dumps(doc) for sublist in documents for doc in sublist]
-            # Get unique documents
-            unique_docs = list(set(flattened_docs))
-            # Return
-            return [loads(doc) for doc in unique_docs]
+            # Key on page_content to deduplicate without serializing each
+            # Document (and its metadata) to JSON and back
+            unique_docs = {}
+            for sublist in documents:
+                for doc in sublist:
+                    unique_docs.setdefault(doc.page_content, doc)
+            return list(unique_docs.values())
         except Exception as e:
             raise ValueError(f"Failed to process documents: {str(e)}")
 
@@ -158,13 +161,8 @@ Question: {question}
 
         try:
             context = "\n".join([doc.page_content for doc in docs])
-            final_rag_chain = (
-                {"context": context, "question": question}
-                | self.rag_template
-                | self.llm
-                | StrOutputParser()
-            )
-            return final_rag_chain.invoke({"question": question})
+            final_rag_chain = self.rag_template | self.llm | StrOutputParser()
+            return final_rag_chain.invoke({"context": context, "question": question})
         except Exception as e:
             raise ValueError(f"Failed to generate answer: {str(e)}")
 